@@ -0,0 +1,150 @@
+"""
+Scraper'ın bellekte tuttuğu satır başına maliyeti ölçer.
+
+Eski temsil (fetch_page'in ürettiği tireli anahtarlı dict + save_to_database'in eklediği
+alt çizgili kopyalar) ile CampgroundRecord karşılaştırılır. Veri seti, API yanıtlarına
+benzeyen sentetik ve ülke çapında bir kamp alanı listesidir; her sayfa JSON'dan
+çözülüp satırlara dönüştürüldükten sonra yanıt bırakılır, yani yalnızca
+all_campgrounds içinde tutulan bellek ölçülür.
+
+Not: "eski" yol, kaldırılan kodun kendisi değil, legacy_row içinde elle yazılmış bir
+yaklaşıklamasıdır. Bazı ayrıntılarda farklıdır; örneğin eski save_to_database
+tireli *-cents anahtarlarındaki ham değerleri kullanıyordu ve bookable/claimed için
+string kontrolü yapıyordu, burada ise doğrudan bool() kullanılır. Satırda kalan
+anahtar ve değer sayısı aynı olduğundan bellek karşılaştırması için yeterlidir.
+
+Kullanım:
+    python benchmarks/row_memory.py --rows 50000
+"""
+import os
+import sys
+import gc
+import json
+import random
+import argparse
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+from models.record import CampgroundRecord
+
+LEGACY_FIELDS = [
+    "name", "region-name", "administrative-area", "nearest-city-name",
+    "operator", "latitude", "longitude", "location-id", "location-type",
+    "accommodation-type-names", "camper-types", "pin-type",
+    "price-low", "price-low-cents", "price-low-currency",
+    "price-high", "price-high-cents", "price-high-currency",
+    "rating", "reviews-count", "photos-count", "videos-count",
+    "bookable", "claimed", "booking-method",
+    "photo-url", "photo-urls", "slug", "availability-updated-at",
+    "created-at", "updated-at"
+]
+
+STATES = ["California", "Colorado", "Utah", "Arizona", "Oregon", "Washington", "Montana",
+          "Wyoming", "Idaho", "Texas", "Florida", "Michigan", "Maine", "New York", "Nevada"]
+PIN_TYPES = ["established", "dispersed", "lodging", "rv-park"]
+LOCATION_TYPES = ["Campground", "Dispersed", "Lodging"]
+BOOKING_METHODS = ["ridb", "external_select", "none"]
+
+def make_page(rng: random.Random, start: int, size: int) -> bytes:
+    """API yanıtına benzeyen bir sayfayı JSON olarak üret"""
+    items = []
+    for n in range(start, start + size):
+        state = rng.choice(STATES)
+        slug = f"campground-{n}"
+        low = rng.randint(0, 60)
+        items.append({"attributes": {
+            "name": f"Campground {n}",
+            "region-name": state,
+            "administrative-area": f"{state} National Forest {n % 300}",
+            "nearest-city-name": f"City {n % 2000}",
+            "operator": f"Operator {n % 500}",
+            "latitude": rng.uniform(24.4, 49.4),
+            "longitude": rng.uniform(-125.0, -66.9),
+            "location-id": n,
+            "location-type": rng.choice(LOCATION_TYPES),
+            "accommodation-type-names": ["RVs", "Tents"],
+            "camper-types": ["tent", "rv"],
+            "pin-type": rng.choice(PIN_TYPES),
+            "price-low": f"${low}.00",
+            "price-low-cents": low * 100,
+            "price-low-currency": "USD",
+            "price-high": f"${low + 20}.00",
+            "price-high-cents": (low + 20) * 100,
+            "price-high-currency": "USD",
+            "rating": round(rng.uniform(1, 5), 2),
+            "reviews-count": rng.randint(0, 400),
+            "photos-count": rng.randint(0, 200),
+            "videos-count": rng.randint(0, 5),
+            "bookable": rng.random() < 0.4,
+            "claimed": rng.random() < 0.2,
+            "booking-method": rng.choice(BOOKING_METHODS),
+            "photo-url": f"https://images.thedyrt.com/photos/{n}.jpg",
+            "photo-urls": [f"https://images.thedyrt.com/photos/{n}-{k}.jpg" for k in range(3)],
+            "slug": slug,
+            "availability-updated-at": "2024-03-01T12:00:00Z",
+            "created-at": "2019-05-04T08:30:00Z",
+            "updated-at": "2024-02-20T10:15:00Z"
+        }})
+    return json.dumps({"data": items}).encode("utf-8")
+
+def url_for(attr) -> str:
+    state_slug = attr.get("region-name", "").lower().replace(" ", "-")
+    return f"https://thedyrt.com/camping/{state_slug}/{attr.get('slug') or ''}"
+
+def legacy_row(attr):
+    """Eski fetch_page + save_to_database dönüşümlerinin satırda bıraktığı dict'in yaklaşıklaması"""
+    row = {}
+    for field in LEGACY_FIELDS:
+        row[field] = attr.get(field)
+    row["url"] = url_for(attr)
+
+    for field in ['availability-updated-at', 'created-at', 'updated-at']:
+        row[field.replace('-', '_')] = datetime.fromisoformat(row[field].replace('Z', '+00:00')) if row.get(field) else None
+    for field in ['bookable', 'claimed']:
+        row[field] = bool(row[field])
+    for field in ['photos-count', 'price-low-cents', 'price-high-cents', 'reviews-count', 'videos-count']:
+        if row[field]:
+            row[field.replace('-', '_')] = int(row[field])
+    if row['rating']:
+        row['rating'] = float(row['rating'])
+    return row
+
+def record_row(attr):
+    return CampgroundRecord.from_api(attr, url_for(attr))
+
+def measure(build, pages) -> int:
+    """Tüm sayfalar işlendikten sonra tutulan satırların bellek maliyetini döndür"""
+    gc.collect()
+    tracemalloc.start()
+    rows = []
+    for payload in pages:
+        data = json.loads(payload)
+        rows.extend(build(item["attributes"]) for item in data["data"])
+        del data
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    assert rows
+    return retained
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=50000, help="Ülke çapında veri setindeki satır sayısı")
+    parser.add_argument("--page-size", type=int, default=500)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    pages = [make_page(rng, start, min(args.page_size, args.rows - start))
+             for start in range(0, args.rows, args.page_size)]
+
+    legacy = measure(legacy_row, pages)
+    compact = measure(record_row, pages)
+
+    print(f"Satır sayısı: {args.rows}")
+    print(f"dict (eski):        {legacy / 1024 / 1024:8.2f} MiB  {legacy / args.rows:8.0f} B/satır")
+    print(f"CampgroundRecord:   {compact / 1024 / 1024:8.2f} MiB  {compact / args.rows:8.0f} B/satır")
+    print(f"Tasarruf:           {(1 - compact / legacy) * 100:8.1f} %")
+
+if __name__ == "__main__":
+    main()
@@ -1,3 +1,4 @@
+from datetime import datetime
 from fastapi import FastAPI, HTTPException, Depends
 from sqlalchemy.orm import Session
 from sqlalchemy import func
@@ -6,13 +7,13 @@ from loguru import logger
 
 from database import get_db, init_db
 from models.campground import Campground, CampgroundCreate, CampgroundInDB
-from scraper import run_scraper
-from scheduler import setup_scheduler
+from scheduler import setup_scheduler, AdaptiveRefreshPlanner
 
 app = FastAPI(title="Kamp Alanı API")
 
-# Zamanlanmış görevler için global değişken
+# Zamanlanmış görevler ve hücre yenileme planlayıcısı için global değişkenler
 scheduler = None
+planner = None
 
 @app.on_event("startup")
 async def startup_event():
@@ -21,8 +22,9 @@ async def startup_event():
     init_db()
     
     # Zamanlanmış görevleri başlat
-    global scheduler
-    scheduler = setup_scheduler()
+    global scheduler, planner
+    planner = AdaptiveRefreshPlanner()
+    scheduler = setup_scheduler(planner)
     logger.info("Uygulama ve zamanlanmış görevler başlatıldı.")
 
 @app.on_event("shutdown")
@@ -61,10 +63,18 @@ async def get_campground(campground_id: int, db: Session = Depends(get_db)):
 
 @app.post("/scrape/")
 async def trigger_scrape():
-    """Manuel olarak veri çekme işlemini başlat"""
+    """Manuel olarak veri çekme işlemini başlat (tüm hücreler günlük istek bütçesi dahilinde yenilenir)"""
+    if not scheduler or not planner:
+        raise HTTPException(status_code=503, detail="Zamanlanmış görevler çalışmıyor")
     try:
-        run_scraper()
-        return {"message": "Veri çekme işlemi başarıyla tamamlandı"}
+        marked = planner.mark_all_due()
+        scheduler.modify_job('adaptive_refresh', next_run_time=datetime.now())
+        return {
+            "message": "Tüm hücreler yenileme için sıraya alındı",
+            "marked_cells": marked,
+            "requests_today": planner.requests_today,
+            "daily_request_budget": planner.daily_request_budget
+        }
     except Exception as e:
         logger.error(f"Veri çekme işlemi sırasında hata: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -0,0 +1,122 @@
+import sys
+from dataclasses import dataclass, fields
+from datetime import datetime
+from typing import Optional, List, Dict, Any
+
+def _intern(val: Any) -> Any:
+    # Sınırlı sayıda değer alan alanlar (pin tipi, para birimi vb.) tek bir string nesnesini paylaşır
+    return sys.intern(val) if isinstance(val, str) else val
+
+def _to_datetime(val: Any) -> Optional[datetime]:
+    if not val:
+        return None
+    try:
+        return datetime.fromisoformat(val.replace('Z', '+00:00'))
+    except (AttributeError, ValueError):
+        return None
+
+def _to_bool(val: Any) -> bool:
+    if isinstance(val, str):
+        return val.lower() == 'true'
+    return bool(val)
+
+def _to_int(val: Any) -> Optional[int]:
+    if val is None or val == "":
+        return None
+    try:
+        return int(val)
+    except (TypeError, ValueError):
+        return None
+
+def _to_float(val: Any) -> Optional[float]:
+    if val is None or val == "":
+        return None
+    try:
+        return float(val)
+    except (TypeError, ValueError):
+        return None
+
+@dataclass(slots=True)
+class CampgroundRecord:
+    """Scraper'dan veritabanına aktarılan kamp alanı satırı için kompakt kayıt"""
+    name: Optional[str] = None
+    region_name: Optional[str] = None
+    administrative_area: Optional[str] = None
+    nearest_city_name: Optional[str] = None
+    operator: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    location_id: Optional[int] = None
+    location_type: Optional[str] = None
+    accommodation_type_names: Optional[List[str]] = None
+    camper_types: Optional[List[str]] = None
+    pin_type: Optional[str] = None
+    price_low: Optional[str] = None
+    price_low_cents: Optional[int] = None
+    price_low_currency: Optional[str] = None
+    price_high: Optional[str] = None
+    price_high_cents: Optional[int] = None
+    price_high_currency: Optional[str] = None
+    rating: Optional[float] = None
+    reviews_count: Optional[int] = None
+    photos_count: Optional[int] = None
+    videos_count: Optional[int] = None
+    bookable: Optional[bool] = None
+    claimed: Optional[bool] = None
+    booking_method: Optional[str] = None
+    photo_url: Optional[str] = None
+    photo_urls: Optional[List[str]] = None
+    slug: Optional[str] = None
+    availability_updated_at: Optional[datetime] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    url: Optional[str] = None
+
+    @classmethod
+    def from_api(cls, attr: Dict[str, Any], url: str) -> "CampgroundRecord":
+        """API'den gelen attributes sözlüğünden dönüşümleri yapılmış bir kayıt oluştur"""
+        return cls(
+            name=attr.get("name"),
+            region_name=_intern(attr.get("region-name")),
+            administrative_area=attr.get("administrative-area"),
+            nearest_city_name=attr.get("nearest-city-name"),
+            operator=attr.get("operator"),
+            latitude=attr.get("latitude"),
+            longitude=attr.get("longitude"),
+            location_id=attr.get("location-id"),
+            location_type=_intern(attr.get("location-type")),
+            accommodation_type_names=attr.get("accommodation-type-names"),
+            camper_types=attr.get("camper-types"),
+            pin_type=_intern(attr.get("pin-type")),
+            price_low=attr.get("price-low"),
+            price_low_cents=_to_int(attr.get("price-low-cents")),
+            price_low_currency=_intern(attr.get("price-low-currency")),
+            price_high=attr.get("price-high"),
+            price_high_cents=_to_int(attr.get("price-high-cents")),
+            price_high_currency=_intern(attr.get("price-high-currency")),
+            rating=_to_float(attr.get("rating")),
+            reviews_count=_to_int(attr.get("reviews-count")),
+            photos_count=_to_int(attr.get("photos-count")),
+            videos_count=_to_int(attr.get("videos-count")),
+            bookable=_to_bool(attr.get("bookable")),
+            claimed=_to_bool(attr.get("claimed")),
+            booking_method=_intern(attr.get("booking-method")),
+            photo_url=attr.get("photo-url"),
+            photo_urls=attr.get("photo-urls"),
+            slug=attr.get("slug"),
+            availability_updated_at=_to_datetime(attr.get("availability-updated-at")),
+            created_at=_to_datetime(attr.get("created-at")),
+            updated_at=_to_datetime(attr.get("updated-at")),
+            url=url
+        )
+
+    def apply_to(self, obj: Any, skip_none: bool = False) -> Any:
+        """Kayıttaki alanları ara sözlük oluşturmadan ORM nesnesine aktar"""
+        for name in FIELD_NAMES:
+            value = getattr(self, name)
+            if skip_none and value is None:
+                continue
+            setattr(obj, name, value)
+        return obj
+
+FIELD_NAMES = tuple(f.name for f in fields(CampgroundRecord))
@@ -1,38 +1,271 @@
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.cron import CronTrigger
-from loguru import logger
-from scraper import run_scraper
-
-def setup_scheduler():
-    """Zamanlanmış görevleri ayarla ve scheduler'ı döndür"""
-    scheduler = BackgroundScheduler()
-    
-    # Her gün gece yarısı çalışacak şekilde ayarla
-    scheduler.add_job(
-        run_scraper,
-        trigger=CronTrigger(hour=0, minute=0),
-        id='daily_scrape',
-        name='Günlük kamp alanı güncelleme',
-        replace_existing=True
-    )
-    
-    try:
-        scheduler.start()
-        logger.info("Zamanlanmış görevler başlatıldı.")
-        return scheduler
-    except Exception as e:
-        logger.error(f"Zamanlanmış görevler başlatılırken hata: {str(e)}")
-        raise
-
-if __name__ == "__main__":
-    # Test için
-    scheduler = setup_scheduler()
-    
-    try:
-        # Scheduler çalışırken program kapatılmamalı
-        import time
-        while True:
-            time.sleep(60)
-    except (KeyboardInterrupt, SystemExit):
-        # Program sonlandığında scheduler'ı durdur
-        scheduler.shutdown() 
\ No newline at end of file
+import os
+import json
+import math
+import hashlib
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Optional, Tuple
+from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.triggers.interval import IntervalTrigger
+from loguru import logger
+from scraper import DyrtScraper
+from models.record import CampgroundRecord
+
+class AdaptiveRefreshPlanner:
+    """Her grid hücresi için istatistik tutar ve hücre bazında yenileme aralığı belirler"""
+
+    def __init__(self, scraper: Optional[DyrtScraper] = None):
+        self.scraper = scraper or DyrtScraper()
+        self.stats_cache_file = "cell_stats_cache.json"
+
+        # Yenileme aralığı sınırları
+        self.min_interval = timedelta(hours=6)     # Sık değişen hücreler için en kısa aralık
+        self.max_interval = timedelta(days=7)      # Boş ya da durağan hücreler için en uzun aralık
+        self.error_backoff = timedelta(hours=1)    # Hatalı hücreler için başlangıç bekleme süresi
+        self.initial_change_rate = 0.5             # İlk kez görülen hücreler için varsayılan değişim oranı
+        self.change_rate_alpha = 0.3               # Değişim oranı için üstel ortalama katsayısı
+
+        # Global istek bütçesi (tam tarama günde en az 500 istek harcıyordu)
+        self.daily_request_budget = int(os.getenv("SCRAPER_DAILY_REQUEST_BUDGET", "400"))
+        self.tick_minutes = int(os.getenv("SCRAPER_TICK_MINUTES", "10"))
+
+        self.cells: Dict[str, Dict[str, Any]] = {}
+        self.budget_day = datetime.now().date().isoformat()
+        self.requests_today = 0
+        self.load_stats()
+
+    def load_stats(self):
+        """Hücre istatistiklerini ve günlük bütçe kullanımını yükle"""
+        if not os.path.exists(self.stats_cache_file):
+            return
+        try:
+            with open(self.stats_cache_file, 'r') as f:
+                state = json.load(f)
+            self.cells = state.get('cells', {})
+            if state.get('budget_day') == self.budget_day:
+                self.requests_today = state.get('requests_today', 0)
+            logger.info(f"Hücre istatistikleri yüklendi: {len(self.cells)} hücre, bugün {self.requests_today} istek kullanıldı")
+        except Exception as e:
+            logger.error(f"Hücre istatistikleri yüklenirken hata: {str(e)}")
+            self.cells = {}
+
+    def save_stats(self):
+        """Hücre istatistiklerini ve günlük bütçe kullanımını kaydet"""
+        try:
+            state = {
+                'budget_day': self.budget_day,
+                'requests_today': self.requests_today,
+                'cells': self.cells
+            }
+            with open(self.stats_cache_file, 'w') as f:
+                json.dump(state, f)
+        except Exception as e:
+            logger.error(f"Hücre istatistikleri kaydedilirken hata: {str(e)}")
+
+    def get_cell(self, grid_x: int, grid_y: int) -> Dict[str, Any]:
+        """Hücrenin istatistik kaydını döndür, yoksa oluştur"""
+        key = f"{grid_x},{grid_y}"
+        if key not in self.cells:
+            self.cells[key] = {
+                'row_count': None,
+                'change_rate': self.initial_change_rate,
+                'signature': None,
+                'last_success': None,
+                'last_attempt': None,
+                'error_streak': 0,
+                'next_refresh': None
+            }
+        return self.cells[key]
+
+    def refresh_interval(self, cell: Dict[str, Any]) -> timedelta:
+        """Hücre istatistiklerinden bir sonraki yenilemeye kadar geçecek süreyi hesapla"""
+        # Hatalı hücrelerde üstel geri çekilme
+        if cell['error_streak'] > 0:
+            return min(self.error_backoff * (2 ** (cell['error_streak'] - 1)), self.max_interval)
+
+        # Boş hücreler nadiren yenilenir
+        if not cell['row_count']:
+            return self.max_interval
+
+        # Değişim oranı arttıkça aralık kısalır
+        interval = self.min_interval / max(cell['change_rate'], 0.001)
+        return max(self.min_interval, min(interval, self.max_interval))
+
+    def estimate_cost(self, cell: Dict[str, Any]) -> int:
+        """Hücreyi yenilemek için gereken tahmini istek sayısı (yeniden denemeler hariç,
+        bunlar scraper'ın request_limit sınırıyla karşılanır)"""
+        if not cell['row_count']:
+            return 1
+        return cell['row_count'] // self.scraper.page_size + 1
+
+    def compute_signature(self, campgrounds: List[CampgroundRecord]) -> str:
+        """Hücredeki değişimi tespit etmek için yalnızca müsaitlik ve fiyat alanlarından özet çıkar.
+        updated_at ve yorum sayısı gibi alanlar her düzenlemede değiştiği için dahil edilmez."""
+        # Satırlar JSON metni olarak sıralanır; None ile sayı/metin karşılaştırılmaz ve
+        # aynı URL'ye sahip satırlar da API'nin döndürdüğü sıradan bağımsız olur
+        keys = sorted(
+            json.dumps([c.url, c.price_low_cents, c.price_high_cents,
+                        c.availability_updated_at, c.bookable], default=str)
+            for c in campgrounds
+        )
+        return hashlib.md5("\n".join(keys).encode('utf-8')).hexdigest()
+
+    def due_cells(self, now: datetime) -> List[Tuple[int, int]]:
+        """Yenileme zamanı gelmiş hücreleri en çok geciken önce olacak şekilde döndür"""
+        due = []
+        for i in range(self.scraper.grid_x):
+            for j in range(self.scraper.grid_y):
+                cell = self.get_cell(i, j)
+                next_refresh = datetime.fromisoformat(cell['next_refresh']) if cell['next_refresh'] else datetime.min
+                if next_refresh <= now:
+                    due.append((next_refresh, i, j))
+        due.sort()
+        return [(i, j) for _, i, j in due]
+
+    def tick_allowance(self, now: datetime) -> int:
+        """Kalan günlük bütçeyi günün kalan çalışmalarına eşit dağıt"""
+        today = now.date().isoformat()
+        if today != self.budget_day:
+            self.budget_day = today
+            self.requests_today = 0
+
+        remaining = self.daily_request_budget - self.requests_today
+        if remaining <= 0:
+            return 0
+
+        midnight = datetime.combine(now.date() + timedelta(days=1), datetime.min.time())
+        remaining_ticks = max(1, math.ceil((midnight - now) / timedelta(minutes=self.tick_minutes)))
+        return max(1, math.ceil(remaining / remaining_ticks))
+
+    def record_result(self, grid_x: int, grid_y: int, campgrounds: Optional[List[CampgroundRecord]], now: datetime):
+        """Hücre yenileme sonucunu istatistiklere işle ve sonraki yenileme zamanını belirle"""
+        cell = self.get_cell(grid_x, grid_y)
+        cell['last_attempt'] = now.isoformat()
+
+        if campgrounds is None:
+            cell['error_streak'] += 1
+        else:
+            signature = self.compute_signature(campgrounds)
+            if cell['signature'] is not None:
+                changed = 1.0 if signature != cell['signature'] else 0.0
+                cell['change_rate'] = self.change_rate_alpha * changed + (1 - self.change_rate_alpha) * cell['change_rate']
+            cell['signature'] = signature
+            cell['row_count'] = len(campgrounds)
+            cell['last_success'] = now.isoformat()
+            cell['error_streak'] = 0
+
+        cell['next_refresh'] = (now + self.refresh_interval(cell)).isoformat()
+
+    def mark_all_due(self, now: Optional[datetime] = None) -> int:
+        """Tüm hücreleri hemen yenilenecek şekilde işaretle; zaten gecikmiş olanların sırası korunur"""
+        now = now or datetime.now()
+        marked = 0
+        for i in range(self.scraper.grid_x):
+            for j in range(self.scraper.grid_y):
+                cell = self.get_cell(i, j)
+                if cell['next_refresh'] and datetime.fromisoformat(cell['next_refresh']) > now:
+                    cell['next_refresh'] = now.isoformat()
+                    marked += 1
+        self.save_stats()
+        logger.info(f"Manuel yenileme: {marked} hücre daha erken yenilenmek üzere işaretlendi.")
+        return marked
+
+    def run_tick(self):
+        """Bütçe dahilinde yenileme zamanı gelen hücreleri güncelle"""
+        now = datetime.now()
+        allowance = self.tick_allowance(now)
+        if allowance == 0:
+            logger.info("Günlük istek bütçesi doldu, yenileme atlanıyor.")
+            return
+
+        due = self.due_cells(now)
+        if not due:
+            return
+        logger.info(f"{len(due)} hücrenin yenileme zamanı geldi, bu çalışmada bütçe: {allowance} istek")
+
+        spent = 0
+        refreshed = 0
+        for i, j in due:
+            cell = self.get_cell(i, j)
+            cost = self.estimate_cost(cell)
+            remaining = self.daily_request_budget - self.requests_today
+            if remaining <= 0:
+                break
+
+            limit = remaining
+            if cost > self.daily_request_budget and self.requests_today == 0:
+                # Günlük bütçeden büyük hücre hiçbir zaman sığmaz; günün ilk işi olarak tahmini
+                # maliyeti kadar istekle çekilir, aksi halde sonsuza kadar vadesi gelmiş kalırdı
+                logger.warning(f"Grid ({i},{j}) için tahmini {cost} istek günlük bütçeden ({self.daily_request_budget}) "
+                               f"büyük, günün ilk yenilemesi olarak bütçe aşılarak çekiliyor.")
+                limit = cost
+            elif cost > remaining:
+                # Daha ucuz hücreler kalan bütçeyi kullanabilsin diye sıradakine geç
+                logger.info(f"Grid ({i},{j}) için tahmini {cost} istek kalan günlük bütçeyi ({remaining}) aşıyor.")
+                continue
+            elif refreshed > 0 and spent + cost > allowance:
+                continue
+
+            # Yeniden denemeler de dahil olmak üzere belirlenen sınır aşılamaz
+            start_count = self.scraper.request_count
+            self.scraper.request_limit = start_count + limit
+            try:
+                campgrounds = self.scraper.scrape_cell(i, j)
+            finally:
+                self.scraper.request_limit = None
+            used = self.scraper.request_count - start_count
+            spent += used
+            self.requests_today += used
+
+            if campgrounds is None and self.requests_today >= self.daily_request_budget:
+                # Hücre hatadan değil bütçe bittiği için yarım kaldı; hata sayılmaz ve vadesi gelmiş kalır
+                self.save_stats()
+                logger.info(f"Grid ({i},{j}) yenilenirken günlük istek bütçesi doldu.")
+                break
+            refreshed += 1
+
+            if campgrounds:
+                self.scraper.save_to_database(campgrounds)
+            self.record_result(i, j, campgrounds, datetime.now())
+            self.save_stats()
+
+            logger.info(f"Grid ({i},{j}) yenilendi: {cell['row_count']} kamp alanı, "
+                        f"değişim oranı {cell['change_rate']:.2f}, sonraki yenileme {cell['next_refresh']}")
+
+        logger.info(f"{refreshed} hücre yenilendi, {spent} istek kullanıldı (bugün toplam {self.requests_today}/{self.daily_request_budget})")
+
+def setup_scheduler(planner: Optional[AdaptiveRefreshPlanner] = None):
+    """Zamanlanmış görevleri ayarla ve scheduler'ı döndür"""
+    scheduler = BackgroundScheduler()
+    planner = planner or AdaptiveRefreshPlanner()
+
+    # Hücreleri kendi yenileme aralıklarına göre kısa periyotlarla güncelle
+    scheduler.add_job(
+        planner.run_tick,
+        trigger=IntervalTrigger(minutes=planner.tick_minutes),
+        id='adaptive_refresh',
+        name='Hücre bazlı uyarlamalı kamp alanı güncelleme',
+        max_instances=1,
+        coalesce=True,
+        replace_existing=True
+    )
+
+    try:
+        scheduler.start()
+        logger.info("Zamanlanmış görevler başlatıldı.")
+        return scheduler
+    except Exception as e:
+        logger.error(f"Zamanlanmış görevler başlatılırken hata: {str(e)}")
+        raise
+
+if __name__ == "__main__":
+    # Test için
+    scheduler = setup_scheduler()
+
+    try:
+        # Scheduler çalışırken program kapatılmamalı
+        import time
+        while True:
+            time.sleep(60)
+    except (KeyboardInterrupt, SystemExit):
+        # Program sonlandığında scheduler'ı durdur
+        scheduler.shutdown()
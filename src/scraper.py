@@ -1,12 +1,12 @@
 import time
 import re
 import requests
-from datetime import datetime
-from typing import List, Dict, Any
+from typing import List, Optional
 from loguru import logger
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 from models.campground import Campground, CampgroundCreate
+from models.record import CampgroundRecord
 from database import get_db_context
 import concurrent.futures
 from itertools import islice
@@ -17,17 +17,6 @@ import random
 class DyrtScraper:
     def __init__(self):
         self.base_url = "https://thedyrt.com/api/v6/locations/search-results"  # Doğru API endpoint'i
-        self.fields = [
-            "name", "region-name", "administrative-area", "nearest-city-name",
-            "operator", "latitude", "longitude", "location-id", "location-type",
-            "accommodation-type-names", "camper-types", "pin-type",
-            "price-low", "price-low-cents", "price-low-currency",
-            "price-high", "price-high-cents", "price-high-currency",
-            "rating", "reviews-count", "photos-count", "videos-count",
-            "bookable", "claimed", "booking-method",
-            "photo-url", "photo-urls", "slug", "availability-updated-at",
-            "created-at", "updated-at"
-        ]
         # Grid sistemi için ABD sınırları
         self.min_lng, self.min_lat = -125.0, 24.3963  # Batı ve Güney
         self.max_lng, self.max_lat = -66.9346, 49.3844  # Doğu ve Kuzey
@@ -40,6 +29,7 @@ class DyrtScraper:
         self.page_size = 500  # Sayfa başına veri sayısı (maksimum değere yükseltildi)
         self.pages_per_batch = 1  # Her batch'te çekilecek sayfa sayısı
         self.batch_delay = 1     # Batch'ler arası bekleme süresi (saniye)
+        self.cell_sort = "name-raw"  # Tek hücre yenilemelerinde sabit sıralama
         
         # Durum takibi için ayarlar
         self.state_cache_file = "grid_state_cache.json"
@@ -47,6 +37,10 @@ class DyrtScraper:
         self.current_grid_y = 0
         self.current_page = 1
         self.load_state()
+        
+        # Bütçe takibi için gönderilen toplam API isteği sayısı
+        self.request_count = 0
+        self.request_limit: Optional[int] = None  # request_count bu değere ulaşınca yeni istek gönderilmez
 
     def slugify(self, text: str) -> str:
         """Metni URL-dostu formata dönüştür"""
@@ -101,11 +95,15 @@ class DyrtScraper:
         ]
         return f"{bbox[0]},{bbox[1]},{bbox[2]},{bbox[3]}"
 
-    def fetch_page(self, grid_x: int, grid_y: int, page: int) -> List[Dict[str, Any]]:
-        """Belirli bir grid konumu için tek bir sayfayı çek"""
+    def fetch_page(self, grid_x: int, grid_y: int, page: int, sort: Optional[str] = None) -> Optional[List[CampgroundRecord]]:
+        """Belirli bir grid konumu için tek bir sayfayı çek, tüm denemeler başarısız olursa None döndür.
+        sort verilmezse her istekte rastgele bir sıralama seçilir."""
         bbox_str = self.get_bbox_for_grid(grid_x, grid_y)
         
         for retry in range(self.max_retries):
+            if self.request_limit is not None and self.request_count >= self.request_limit:
+                logger.warning(f"Grid ({grid_x},{grid_y}) - Sayfa {page}: istek bütçesi doldu, istek gönderilmiyor.")
+                return None
             try:
                 # Farklı sort parametreleri deneyerek API'yi optimize edelim
                 sort_options = ["recommended", "name-raw", "-rating,-reviews-count", "-reviews-count", 
@@ -115,7 +113,7 @@ class DyrtScraper:
                     "filter[search][bbox]": bbox_str,
                     "page[number]": page,
                     "page[size]": self.page_size,
-                    "sort": random.choice(sort_options)
+                    "sort": sort or random.choice(sort_options)
                 }
                 
                 # User-Agent'ı değiştirerek daha insana benzer davranış gösterelim
@@ -128,6 +126,7 @@ class DyrtScraper:
                 
                 # API'ye istek gönder
                 logger.info(f"Grid ({grid_x},{grid_y}) - Sayfa {page} isteniyor... (Deneme {retry + 1}/{self.max_retries})")
+                self.request_count += 1
                 response = requests.get(self.base_url, params=params, headers=headers)
                 response.raise_for_status()
                 data = response.json()
@@ -139,17 +138,13 @@ class DyrtScraper:
                 page_campgrounds = []
                 for item in data["data"]:
                     attr = item["attributes"]
-                    row = {}
-                    for field in self.fields:
-                        val = attr.get(field)
-                        row[field] = val
                     
                     # URL oluştur
                     state_slug = self.slugify(attr.get("region-name", ""))
                     slug = attr.get("slug") or ""
-                    row["url"] = f"https://thedyrt.com/camping/{state_slug}/{slug}"
+                    url = f"https://thedyrt.com/camping/{state_slug}/{slug}"
                     
-                    page_campgrounds.append(row)
+                    page_campgrounds.append(CampgroundRecord.from_api(attr, url))
                 
                 logger.info(f"Grid ({grid_x},{grid_y}) - Sayfa {page}: {len(page_campgrounds)} kamp alanı bulundu.")
                 
@@ -168,9 +163,9 @@ class DyrtScraper:
                     time.sleep(wait_time)
                 else:
                     logger.error(f"Grid ({grid_x},{grid_y}) - Sayfa {page} için maksimum deneme sayısına ulaşıldı.")
-                    return []
+                    return None
 
-    def get_campgrounds(self) -> List[Dict[str, Any]]:
+    def get_campgrounds(self) -> List[CampgroundRecord]:
         """Tüm ABD'deki kamp alanlarını grid sistemi kullanarak çek"""
         all_campgrounds = []
         total_regions = self.grid_x * self.grid_y
@@ -240,121 +235,61 @@ class DyrtScraper:
         self.save_state()
 
         # Tekrar eden kamp alanlarını kaldır
-        unique = {(c['name'], c['latitude'], c['longitude']): c for c in all_campgrounds 
-                if c.get('name') and c.get('latitude') and c.get('longitude')}
-        unique_campgrounds = list(unique.values())
+        unique_campgrounds = self.deduplicate(all_campgrounds)
         logger.info(f"Toplam {len(all_campgrounds)} kamp alanı bulundu, {len(unique_campgrounds)} benzersiz kamp alanı kaydedilecek.")
         return unique_campgrounds
 
-    def save_to_database(self, campgrounds: List[Dict[str, Any]]) -> None:
+    def scrape_cell(self, grid_x: int, grid_y: int) -> Optional[List[CampgroundRecord]]:
+        """Tek bir grid hücresinin tüm sayfalarını çek, hata durumunda None döndür"""
+        # Sayfalar arasında satır kaymaması için hücrenin tüm sayfalarında aynı sıralama kullanılır
+        cell_campgrounds = []
+        page = 1
+        
+        while True:
+            page_campgrounds = self.fetch_page(grid_x, grid_y, page, sort=self.cell_sort)
+            if page_campgrounds is None:
+                return None
+            
+            cell_campgrounds.extend(page_campgrounds)
+            if len(page_campgrounds) < self.page_size:
+                break
+            
+            # Rate limiting'e takılmamak için sayfalar arasında bekleme
+            time.sleep(1 * random.uniform(0.8, 1.2))
+            page += 1
+        
+        return self.deduplicate(cell_campgrounds)
+
+    def deduplicate(self, campgrounds: List[CampgroundRecord]) -> List[CampgroundRecord]:
+        """Ad ve koordinatlara göre tekrar eden kamp alanlarını kaldır"""
+        unique = {(c.name, c.latitude, c.longitude): c for c in campgrounds 
+                if c.name and c.latitude and c.longitude}
+        return list(unique.values())
+
+    def save_to_database(self, campgrounds: List[CampgroundRecord]) -> None:
         """Kamp alanlarını veritabanına kaydet"""
         logger.info("Veritabanına kaydediliyor...")
         
         with get_db_context() as db:
             try:
                 total = len(campgrounds)
-                for i, row in enumerate(campgrounds, 1):
+                for i, record in enumerate(campgrounds, 1):
                     if i % 100 == 0 or i == total:
                         logger.info(f"İlerleme: {i}/{total} ({i/total*100:.1f}%)")
                     
-                    # Dönüşümler
-                    if row.get('availability-updated-at'):
-                        try:
-                            row['availability_updated_at'] = datetime.fromisoformat(
-                                row['availability-updated-at'].replace('Z', '+00:00')
-                            )
-                        except:
-                            row['availability_updated_at'] = None
-                    else:
-                        row['availability_updated_at'] = None
-
-                    # Tarih alanlarını dönüştür
-                    for field in ['created-at', 'updated-at']:
-                        if row.get(field):
-                            try:
-                                row[field.replace('-', '_')] = datetime.fromisoformat(
-                                    row[field].replace('Z', '+00:00')
-                                )
-                            except:
-                                row[field.replace('-', '_')] = None
-                        else:
-                            row[field.replace('-', '_')] = None
-
-                    # Boolean alanları dönüştür
-                    for field in ['bookable', 'claimed']:
-                        if field in row:
-                            val = row[field]
-                            if isinstance(val, str):
-                                row[field] = val.lower() == 'true'
-                            else:
-                                row[field] = bool(val)
-
-                    # Sayısal alanları dönüştür
-                    for field in ['photos-count', 'price-low-cents', 'price-high-cents', 'reviews-count', 'videos-count']:
-                        if field in row and row[field]:
-                            try:
-                                row[field.replace('-', '_')] = int(row[field])
-                            except:
-                                row[field.replace('-', '_')] = None
-
-                    # Float alanları dönüştür
-                    for field in ['rating']:
-                        if field in row and row[field]:
-                            try:
-                                row[field] = float(row[field])
-                            except:
-                                row[field] = None
-
-                    # Campground modeli için veri hazırla
-                    campground_data = {
-                        "name": row.get("name"),
-                        "region_name": row.get("region-name"),
-                        "administrative_area": row.get("administrative-area"),
-                        "nearest_city_name": row.get("nearest-city-name"),
-                        "operator": row.get("operator"),
-                        "latitude": row.get("latitude"),
-                        "longitude": row.get("longitude"),
-                        "location_id": row.get("location-id"),
-                        "location_type": row.get("location-type"),
-                        "accommodation_type_names": row.get("accommodation-type-names"),
-                        "camper_types": row.get("camper-types"),
-                        "pin_type": row.get("pin-type"),
-                        "price_low": row.get("price-low"),
-                        "price_low_cents": row.get("price-low-cents"),
-                        "price_low_currency": row.get("price-low-currency"),
-                        "price_high": row.get("price-high"),
-                        "price_high_cents": row.get("price-high-cents"),
-                        "price_high_currency": row.get("price-high-currency"),
-                        "rating": row.get("rating"),
-                        "reviews_count": row.get("reviews-count"),
-                        "photos_count": row.get("photos-count"),
-                        "videos_count": row.get("videos-count"),
-                        "bookable": row.get("bookable"),
-                        "claimed": row.get("claimed"),
-                        "booking_method": row.get("booking-method"),
-                        "photo_url": row.get("photo-url"),
-                        "photo_urls": row.get("photo-urls"),
-                        "slug": row.get("slug"),
-                        "availability_updated_at": row.get("availability_updated_at"),
-                        "created_at": row.get("created_at"),
-                        "updated_at": row.get("updated_at"),
-                        "url": row.get("url")
-                    }
-                    
+                    # Alan dönüşümleri CampgroundRecord.from_api içinde yapıldı
                     # URL'ye göre var olan kaydı kontrol et (update için)
-                    if campground_data.get("url"):
-                        existing = db.query(Campground).filter(Campground.url == campground_data["url"]).first()
+                    if record.url:
+                        existing = db.query(Campground).filter(Campground.url == record.url).first()
                         if existing:
                             # Kaydı güncelle
-                            for key, value in campground_data.items():
-                                if value is not None and hasattr(existing, key):
-                                    setattr(existing, key, value)
-                            logger.debug(f"Kampground güncellendi: {campground_data['name']}")
+                            record.apply_to(existing, skip_none=True)
+                            logger.debug(f"Kampground güncellendi: {record.name}")
                         else:
                             # Yeni kayıt ekle
-                            campground = Campground(**campground_data)
+                            campground = record.apply_to(Campground())
                             db.add(campground)
-                            logger.debug(f"Yeni kampground eklendi: {campground_data['name']}")
+                            logger.debug(f"Yeni kampground eklendi: {record.name}")
                 
                 db.commit()
                 logger.info(f"Toplam {total} kamp alanı başarıyla veritabanına kaydedildi.")
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Uygulama modülleri src içinden düz import ile yükleniyor (Dockerfile'daki gibi)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
@@ -0,0 +1,77 @@
+import json
+from datetime import datetime, timezone
+
+import pytest
+
+from models.campground import Campground
+from models.record import CampgroundRecord
+
+
+def from_attrs(**attrs):
+    return CampgroundRecord.from_api(attrs, "https://thedyrt.com/camping/utah/camp")
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("true", True),
+    ("False", False),
+    (True, True),
+    (None, False),
+])
+def test_bool_parsing(raw, expected):
+    record = from_attrs(bookable=raw, claimed=raw)
+    assert record.bookable is expected
+    assert record.claimed is expected
+
+
+def test_zulu_timestamp_parsed_as_utc():
+    record = from_attrs(**{"availability-updated-at": "2024-03-01T12:00:00Z"})
+    assert record.availability_updated_at == datetime(2024, 3, 1, 12, 0, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("raw", ["not-a-date", "", None, 1709294400])
+def test_malformed_timestamp_becomes_none(raw):
+    record = from_attrs(**{"created-at": raw, "updated-at": raw})
+    assert record.created_at is None
+    assert record.updated_at is None
+
+
+@pytest.mark.parametrize("raw", ["", "abc", None, [1]])
+def test_bad_numbers_become_none(raw):
+    record = from_attrs(**{"price-low-cents": raw, "price-high-cents": raw, "rating": raw})
+    assert record.price_low_cents is None
+    assert record.price_high_cents is None
+    assert record.rating is None
+
+
+def test_numbers_converted():
+    record = from_attrs(**{"price-low-cents": "1500", "reviews-count": 7, "rating": "4.5"})
+    assert record.price_low_cents == 1500
+    assert record.reviews_count == 7
+    assert record.rating == 4.5
+
+
+def test_low_cardinality_strings_are_interned():
+    payload = json.dumps({"pin-type": "established", "price-low-currency": "USD", "price-high-currency": "USD"})
+    a = from_attrs(**json.loads(payload))
+    b = from_attrs(**json.loads(payload))
+    assert a.pin_type is b.pin_type
+    assert a.price_low_currency is b.price_low_currency
+    assert a.price_low_currency is a.price_high_currency
+
+
+def test_apply_to_keeps_existing_values_when_skipping_none():
+    existing = Campground(name="Old", operator="BLM", rating=4.0, price_low_cents=1000)
+    record = CampgroundRecord(name="New", rating=None, price_low_cents=1200)
+    record.apply_to(existing, skip_none=True)
+    assert existing.name == "New"
+    assert existing.price_low_cents == 1200
+    assert existing.operator == "BLM"
+    assert existing.rating == 4.0
+
+
+def test_apply_to_new_object_sets_every_field():
+    record = from_attrs(name="Camp", latitude=40.1, longitude=-111.5)
+    campground = record.apply_to(Campground())
+    assert campground.name == "Camp"
+    assert campground.url == record.url
+    assert campground.rating is None
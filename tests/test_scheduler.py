@@ -0,0 +1,206 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from models.record import CampgroundRecord
+from scheduler import AdaptiveRefreshPlanner
+
+
+class FakeScraper:
+    """Ağ ve veritabanı olmadan planlayıcıyı sınamak için DyrtScraper yerine geçer"""
+
+    def __init__(self, results=None, requests_per_cell=1):
+        self.grid_x = 2
+        self.grid_y = 2
+        self.page_size = 500
+        self.max_retries = 5
+        self.request_count = 0
+        self.request_limit = None
+        self.results = results or {}
+        self.requests_per_cell = requests_per_cell
+        self.scraped = []
+
+    def scrape_cell(self, grid_x, grid_y):
+        self.scraped.append((grid_x, grid_y))
+        for _ in range(self.requests_per_cell):
+            if self.request_limit is not None and self.request_count >= self.request_limit:
+                return None
+            self.request_count += 1
+        return self.results.get((grid_x, grid_y), [])
+
+    def save_to_database(self, campgrounds):
+        pass
+
+
+@pytest.fixture
+def planner(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    return AdaptiveRefreshPlanner(FakeScraper())
+
+
+def make_cell(planner, **overrides):
+    cell = planner.get_cell(0, 0)
+    cell.update(overrides)
+    return cell
+
+
+def record(url, price=1000):
+    return CampgroundRecord(name="Camp", url=url, price_low_cents=price)
+
+
+def test_hot_cell_uses_min_interval(planner):
+    cell = make_cell(planner, row_count=120, change_rate=1.0)
+    assert planner.refresh_interval(cell) == planner.min_interval
+
+
+def test_interval_grows_as_change_rate_drops(planner):
+    cell = make_cell(planner, row_count=120, change_rate=0.1)
+    assert planner.refresh_interval(cell) == timedelta(hours=60)
+
+
+def test_stable_cell_capped_at_max_interval(planner):
+    cell = make_cell(planner, row_count=120, change_rate=0.0)
+    assert planner.refresh_interval(cell) == planner.max_interval
+
+
+def test_empty_cell_uses_max_interval(planner):
+    cell = make_cell(planner, row_count=0, change_rate=1.0)
+    assert planner.refresh_interval(cell) == planner.max_interval
+
+
+@pytest.mark.parametrize("streak, expected", [
+    (1, timedelta(hours=1)),
+    (3, timedelta(hours=4)),
+    (20, timedelta(days=7)),
+])
+def test_error_backoff(planner, streak, expected):
+    cell = make_cell(planner, row_count=120, change_rate=1.0, error_streak=streak)
+    assert planner.refresh_interval(cell) == expected
+
+
+def test_record_result_tracks_changes_and_errors(planner):
+    now = datetime(2024, 3, 1, 12, 0)
+    planner.record_result(0, 0, [record("a")], now)
+    cell = planner.get_cell(0, 0)
+    assert cell['row_count'] == 1
+    assert cell['change_rate'] == planner.initial_change_rate
+
+    planner.record_result(0, 0, [record("a")], now)
+    assert cell['change_rate'] == pytest.approx(0.35)
+
+    planner.record_result(0, 0, [record("a", price=2000)], now)
+    assert cell['change_rate'] == pytest.approx(0.545)
+
+    planner.record_result(0, 0, None, now)
+    assert cell['error_streak'] == 1
+    assert cell['next_refresh'] == (now + timedelta(hours=1)).isoformat()
+    assert cell['row_count'] == 1
+
+
+def test_signature_ignores_order_and_duplicate_urls(planner):
+    rows = [record("dup", price=None), record("dup", price=500), record("b")]
+    assert planner.compute_signature(rows) == planner.compute_signature(list(reversed(rows)))
+
+
+def test_signature_ignores_non_price_fields(planner):
+    before = record("a")
+    after = record("a")
+    after.reviews_count = 12
+    after.updated_at = datetime(2024, 3, 2)
+    assert planner.compute_signature([before]) == planner.compute_signature([after])
+
+
+def test_due_cells_orders_never_scraped_first(planner):
+    now = datetime(2024, 3, 1, 12, 0)
+    planner.get_cell(0, 0)['next_refresh'] = (now - timedelta(hours=1)).isoformat()
+    planner.get_cell(0, 1)['next_refresh'] = (now + timedelta(hours=1)).isoformat()
+    planner.get_cell(1, 0)['next_refresh'] = (now - timedelta(hours=5)).isoformat()
+    assert planner.due_cells(now) == [(1, 1), (1, 0), (0, 0)]
+
+
+def test_tick_allowance_spreads_remaining_budget(planner):
+    now = datetime(2024, 3, 1, 12, 0)
+    planner.budget_day = now.date().isoformat()
+    planner.daily_request_budget = 400
+    planner.requests_today = 40
+    # Gece yarısına 72 adet 10 dakikalık çalışma kaldı
+    assert planner.tick_allowance(now) == 5
+
+
+def test_tick_allowance_zero_when_budget_spent(planner):
+    now = datetime(2024, 3, 1, 12, 0)
+    planner.budget_day = now.date().isoformat()
+    planner.requests_today = planner.daily_request_budget
+    assert planner.tick_allowance(now) == 0
+
+
+def test_tick_allowance_resets_on_new_day(planner):
+    now = datetime(2024, 3, 2, 0, 0)
+    planner.budget_day = "2024-03-01"
+    planner.requests_today = planner.daily_request_budget
+    assert planner.tick_allowance(now) == 3
+    assert planner.budget_day == "2024-03-02"
+    assert planner.requests_today == 0
+
+
+def test_run_tick_never_exceeds_daily_budget(planner):
+    planner.scraper.requests_per_cell = 5
+    planner.requests_today = planner.daily_request_budget - 2
+    planner.run_tick()
+    assert planner.requests_today == planner.daily_request_budget
+    # Bütçe yüzünden yarım kalan hücre hata sayılmaz ve vadesi gelmiş kalır
+    cell = planner.get_cell(0, 0)
+    assert cell['error_streak'] == 0
+    assert cell['next_refresh'] is None
+
+
+def test_run_tick_skips_cells_larger_than_remaining_budget(planner):
+    for i in range(2):
+        for j in range(2):
+            planner.get_cell(i, j).update(row_count=2000)
+    planner.requests_today = planner.daily_request_budget - 3
+    planner.run_tick()
+    assert planner.scraper.scraped == []
+    assert planner.requests_today == planner.daily_request_budget - 3
+
+
+def overdue(planner, grid_x, grid_y, hours, **overrides):
+    cell = planner.get_cell(grid_x, grid_y)
+    cell.update(next_refresh=(datetime.now() - timedelta(hours=hours)).isoformat(), **overrides)
+    return cell
+
+
+def test_run_tick_skips_oversized_cell_and_refreshes_cheaper_ones(planner):
+    planner.daily_request_budget = 3
+    planner.tick_minutes = 24 * 60
+    big = overdue(planner, 0, 0, 48, row_count=1500)
+    overdue(planner, 0, 1, 1, row_count=10)
+    overdue(planner, 1, 0, 1, row_count=10)
+    overdue(planner, 1, 1, 1, row_count=10)
+    planner.requests_today = 1
+    planner.run_tick()
+    assert (0, 0) not in planner.scraper.scraped
+    assert len(planner.scraper.scraped) == 2
+    assert planner.requests_today == 3
+    assert datetime.fromisoformat(big['next_refresh']) < datetime.now()
+
+
+def test_run_tick_runs_cell_larger_than_daily_budget_first_thing(planner):
+    planner.daily_request_budget = 3
+    planner.tick_minutes = 24 * 60
+    big = overdue(planner, 0, 0, 48, row_count=1500)
+    overdue(planner, 0, 1, 1, row_count=10)
+    overdue(planner, 1, 0, 1, row_count=10)
+    overdue(planner, 1, 1, 1, row_count=10)
+    planner.run_tick()
+    assert planner.scraper.scraped[0] == (0, 0)
+    assert datetime.fromisoformat(big['next_refresh']) > datetime.now()
+
+
+def test_mark_all_due_keeps_overdue_order(planner):
+    now = datetime(2024, 3, 1, 12, 0)
+    planner.get_cell(0, 0)['next_refresh'] = (now + timedelta(days=3)).isoformat()
+    planner.get_cell(0, 1)['next_refresh'] = (now - timedelta(hours=5)).isoformat()
+    planner.get_cell(1, 0)['next_refresh'] = (now + timedelta(hours=2)).isoformat()
+    assert planner.mark_all_due(now) == 2
+    assert planner.due_cells(now) == [(1, 1), (0, 1), (0, 0), (1, 0)]